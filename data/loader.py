@@ -0,0 +1,538 @@
+"""
+数据加载器，用于从JSON文件加载人物、情境和对话数据
+"""
+import os
+import re
+import json
+import mmap
+import random
+import asyncio
+import logging
+import tempfile
+from pathlib import Path
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import ijson  # 可选依赖，用于流式解析大文件
+except ImportError:
+    ijson = None
+
+try:
+    import orjson  # 可选依赖，C实现的JSON解析，支持零拷贝缓冲区输入
+except ImportError:
+    orjson = None
+
+# 超过此大小的文件走mmap路径，小文件mmap建立开销不划算
+_MMAP_THRESHOLD = 256 * 1024
+
+# 纯数字ID（"1"、"001"等简写形式）
+_ID_RE = re.compile(r'\A\d+\Z')
+
+
+def _normalize_id(prefix: str, id_str: str) -> str:
+    """
+    把简写ID归一化为带前缀的完整形式
+
+    Args:
+        prefix: ID前缀，如"character_"
+        id_str: 原始ID字符串
+
+    Returns:
+        归一化后的ID，如"character_001"
+    """
+    if id_str.startswith(prefix):
+        return id_str
+    return f"{prefix}{id_str.zfill(3)}" if _ID_RE.match(id_str) else id_str
+
+
+class DataLoader:
+    """
+    基于文件的数据加载器，管理人物、情境和对话历史的读写
+
+    目录结构:
+        data/characters/            人物JSON文件
+        data/characters/templates/  人物模板JSON文件
+        data/scenarios/             情境JSON文件
+        data/scenarios/templates/   情境模板JSON文件
+        data/dialogues/             对话历史JSON文件
+    """
+
+    # 已确认存在的目录，跨实例共享，避免每次保存都stat一遍父目录
+    _known_dirs: set = set()
+
+    def __init__(self, data_dir: str = "data"):
+        """
+        初始化数据加载器
+
+        Args:
+            data_dir: 数据根目录
+        """
+        self.data_dir = Path(data_dir)
+        self.character_dir = self.data_dir / "characters"
+        self.scenario_dir = self.data_dir / "scenarios"
+        self.dialogues_dir = self.data_dir / "dialogues"
+        self.character_templates_dir = self.character_dir / "templates"
+        self.scenario_templates_dir = self.scenario_dir / "templates"
+
+        for directory in (self.character_templates_dir,
+                          self.scenario_templates_dir,
+                          self.dialogues_dir):
+            self._ensure_dir(directory)
+
+        self.logger = logging.getLogger("lebench.data_loader")
+
+        # 目录列表缓存: {键: (目录mtime_ns, 列表结果)}
+        self._listing_cache: Dict[str, Tuple[int, List[str]]] = {}
+
+        # 池索引缓存: {键: (目录mtime元组, {id: 文件路径})}
+        self._index_cache: Dict[str, Tuple[Tuple[int, ...], Dict[str, Path]]] = {}
+
+    @classmethod
+    def _ensure_dir(cls, directory: Path) -> None:
+        """
+        确保目录存在，已确认过的目录直接跳过mkdir
+
+        Args:
+            directory: 目标目录
+        """
+        if directory in cls._known_dirs:
+            return
+        directory.mkdir(parents=True, exist_ok=True)
+        cls._known_dirs.add(directory)
+
+    def load_json_file(self, file_path: Path) -> Dict[str, Any]:
+        """
+        加载单个JSON文件
+
+        Args:
+            file_path: JSON文件路径
+
+        Returns:
+            解析后的数据字典
+        """
+        if orjson is not None:
+            file_path = Path(file_path)
+            if file_path.stat().st_size > _MMAP_THRESHOLD:
+                # 大文件mmap后直接把缓冲区交给orjson解析，省去bytes拷贝
+                with open(file_path, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    return orjson.loads(memoryview(mm))
+            with open(file_path, 'rb') as f:
+                return orjson.loads(f.read())
+
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def save_json_file(self, data: Dict[str, Any], file_path: Path) -> None:
+        """
+        保存数据到JSON文件
+
+        Args:
+            data: 要保存的数据
+            file_path: 目标文件路径
+        """
+        file_path = Path(file_path)
+        self._ensure_dir(file_path.parent)
+
+        # 先完整序列化再一次性写入临时文件，最后原子替换目标文件，
+        # 进程中途崩溃也不会留下半写的JSON
+        payload = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+        fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def load_character(self, character_id: str) -> Optional[Dict[str, Any]]:
+        """
+        根据ID加载人物数据
+
+        Args:
+            character_id: 人物ID，支持"character_001"、"001"或"1"等形式
+
+        Returns:
+            人物数据字典，如果未找到则返回None
+        """
+        character_id = _normalize_id("character_", character_id)
+
+        for directory in (self.character_templates_dir, self.character_dir):
+            file_path = directory / f"{character_id}.json"
+            if file_path.exists():
+                return self.load_json_file(file_path)
+        return None
+
+    def load_scenario(self, scenario_id: str) -> Optional[Dict[str, Any]]:
+        """
+        根据ID加载情境数据
+
+        Args:
+            scenario_id: 情境ID，支持"scenario_001"、"001"或"1"等形式
+
+        Returns:
+            情境数据字典，如果未找到则返回None
+        """
+        scenario_id = _normalize_id("scenario_", scenario_id)
+
+        for directory in (self.scenario_templates_dir, self.scenario_dir):
+            file_path = directory / f"{scenario_id}.json"
+            if file_path.exists():
+                return self.load_json_file(file_path)
+        return None
+
+    def _load_all(self,
+                  main_dir: Path,
+                  templates_dir: Path,
+                  pool_name: str) -> Dict[str, Any]:
+        """
+        并行加载目录下的所有JSON文件
+
+        文件读取是I/O密集型操作，使用线程池让磁盘读取和解析相互重叠，
+        避免逐个文件串行等待。
+
+        Args:
+            main_dir: 主数据目录
+            templates_dir: 模板目录
+            pool_name: 需要排除的汇总文件名（如character_pool.json）
+
+        Returns:
+            {id: 数据字典}的映射
+        """
+        paths = [
+            p
+            for directory in (templates_dir, main_dir)
+            if directory.exists()
+            for p in directory.glob("*.json")
+            if p.name != pool_name
+        ]
+
+        results: Dict[str, Any] = {}
+        if not paths:
+            return results
+
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(self.load_json_file, p): p for p in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    results[path.stem] = future.result()
+                except Exception as e:
+                    self.logger.warning(f"加载文件失败: {path}, 错误: {e}")
+
+        return results
+
+    async def _load_all_async(self,
+                              main_dir: Path,
+                              templates_dir: Path,
+                              pool_name: str) -> Dict[str, Any]:
+        """
+        _load_all的异步版本，供协程调用方使用
+
+        通过asyncio.to_thread把每个文件的读取+解析放到线程池并发执行，
+        事件循环本身不会被阻塞。
+
+        Args:
+            main_dir: 主数据目录
+            templates_dir: 模板目录
+            pool_name: 需要排除的汇总文件名
+
+        Returns:
+            {id: 数据字典}的映射
+        """
+        paths = [
+            p
+            for directory in (templates_dir, main_dir)
+            if directory.exists()
+            for p in directory.glob("*.json")
+            if p.name != pool_name
+        ]
+
+        results: Dict[str, Any] = {}
+        if not paths:
+            return results
+
+        loaded = await asyncio.gather(
+            *[asyncio.to_thread(self.load_json_file, p) for p in paths],
+            return_exceptions=True
+        )
+        for path, data in zip(paths, loaded):
+            if isinstance(data, Exception):
+                self.logger.warning(f"加载文件失败: {path}, 错误: {data}")
+            else:
+                results[path.stem] = data
+
+        return results
+
+    async def load_all_characters_async(self) -> Dict[str, Any]:
+        """
+        load_all_characters的异步版本
+
+        Returns:
+            {人物ID: 人物数据}的映射
+        """
+        return await self._load_all_async(self.character_dir,
+                                          self.character_templates_dir,
+                                          "character_pool.json")
+
+    async def load_all_scenarios_async(self) -> Dict[str, Any]:
+        """
+        load_all_scenarios的异步版本
+
+        Returns:
+            {情境ID: 情境数据}的映射
+        """
+        return await self._load_all_async(self.scenario_dir,
+                                          self.scenario_templates_dir,
+                                          "scenario_pool.json")
+
+    async def load_dialogue_history_async(self, dialogue_id: str) -> Optional[Dict[str, Any]]:
+        """
+        load_dialogue_history的异步版本
+
+        Args:
+            dialogue_id: 对话ID
+
+        Returns:
+            对话历史数据字典，如果未找到则返回None
+        """
+        return await asyncio.to_thread(self.load_dialogue_history, dialogue_id)
+
+    def load_all_characters(self) -> Dict[str, Any]:
+        """
+        加载所有人物数据
+
+        Returns:
+            {人物ID: 人物数据}的映射
+        """
+        return self._load_all(self.character_dir,
+                              self.character_templates_dir,
+                              "character_pool.json")
+
+    def load_all_scenarios(self) -> Dict[str, Any]:
+        """
+        加载所有情境数据
+
+        Returns:
+            {情境ID: 情境数据}的映射
+        """
+        return self._load_all(self.scenario_dir,
+                              self.scenario_templates_dir,
+                              "scenario_pool.json")
+
+    def list_dialogue_files(self) -> List[str]:
+        """
+        列出所有对话历史文件的ID
+
+        结果按目录mtime缓存，目录未变化时重复调用不再扫描文件系统。
+
+        Returns:
+            对话ID列表
+        """
+        mtime = os.stat(self.dialogues_dir).st_mtime_ns
+        cached = self._listing_cache.get("dialogues")
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        # scandir在readdir的同一次系统调用中返回文件类型，
+        # 相比Path.glob省去每个条目的Path构造和stat
+        result = [
+            entry.name[:-5]
+            for entry in os.scandir(self.dialogues_dir)
+            if entry.name.endswith(".json") and entry.is_file(follow_symlinks=False)
+        ]
+        self._listing_cache["dialogues"] = (mtime, result)
+        return result
+
+    def load_dialogue_history(self, dialogue_id: str) -> Optional[Dict[str, Any]]:
+        """
+        加载对话历史
+
+        Args:
+            dialogue_id: 对话ID
+
+        Returns:
+            对话历史数据字典，如果未找到则返回None
+        """
+        file_path = self.dialogues_dir / f"{dialogue_id}.json"
+        if not file_path.exists():
+            return None
+        return self.load_json_file(file_path)
+
+    def load_dialogue_history_tail(self,
+                                   dialogue_id: str,
+                                   k: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        只加载对话历史的最后k轮
+
+        LLM上下文窗口通常只需要最近几轮对话。安装了ijson时流式遍历
+        history数组，内存占用为O(k)而非O(总轮数)；否则退化为全量加载后截取。
+
+        Args:
+            dialogue_id: 对话ID
+            k: 保留的轮数，为None时等价于load_dialogue_history
+
+        Returns:
+            {"id": 对话ID, "history": 最后k轮}，如果未找到则返回None
+        """
+        if k is None:
+            return self.load_dialogue_history(dialogue_id)
+
+        file_path = self.dialogues_dir / f"{dialogue_id}.json"
+        if not file_path.exists():
+            return None
+
+        if ijson is not None:
+            with open(file_path, 'rb') as f:
+                tail = deque(ijson.items(f, 'history.item'), maxlen=k)
+            return {"id": dialogue_id, "history": list(tail)}
+
+        data = self.load_json_file(file_path)
+        history = data.get("history", [])
+        return {"id": dialogue_id, "history": history[-k:]}
+
+    def save_dialogue_history(self, dialogue_id: str, data: Dict[str, Any]) -> None:
+        """
+        保存对话历史
+
+        Args:
+            dialogue_id: 对话ID
+            data: 对话历史数据
+        """
+        self.save_json_file(data, self.dialogues_dir / f"{dialogue_id}.json")
+
+    def match_character_scenario(
+            self,
+            character_id: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        为人物匹配一个冲突情境
+
+        优先从人物配置的conflict_scenarios中选择，否则随机选择一个可用情境。
+
+        Args:
+            character_id: 人物ID，如果为None则随机选择人物
+
+        Returns:
+            (人物数据, 情境数据)的元组
+        """
+        if character_id:
+            character = self.load_character(character_id)
+        else:
+            character = self.get_random_character()
+
+        if not character:
+            return None, None
+
+        # 只取ID集合（目录扫描，零解析），不再加载全部情境内容
+        available_set = self.list_scenario_ids()
+        if not available_set:
+            return character, None
+
+        candidates = [
+            s_id for s_id in character.get("conflict_scenarios", ())
+            if s_id in available_set
+        ]
+
+        scenario_id = random.choice(candidates) if candidates else random.choice(sorted(available_set))
+        return character, self.load_scenario(scenario_id)
+
+    def _pool_index(self,
+                    cache_key: str,
+                    main_dir: Path,
+                    templates_dir: Path,
+                    pool_name: str) -> Dict[str, Path]:
+        """
+        获取{id: 文件路径}的池索引，按目录mtime缓存
+
+        索引只扫描目录，不解析任何文件内容；目录发生变化时自动重建。
+
+        Args:
+            cache_key: 缓存键
+            main_dir: 主数据目录
+            templates_dir: 模板目录
+            pool_name: 需要排除的汇总文件名
+
+        Returns:
+            {id: 文件路径}的映射
+        """
+        dirs = (templates_dir, main_dir)
+        mtimes = tuple(
+            os.stat(d).st_mtime_ns if d.exists() else 0 for d in dirs
+        )
+        cached = self._index_cache.get(cache_key)
+        if cached and cached[0] == mtimes:
+            return cached[1]
+
+        index = {
+            p.stem: p
+            for directory in dirs
+            if directory.exists()
+            for p in directory.glob("*.json")
+            if p.name != pool_name
+        }
+        self._index_cache[cache_key] = (mtimes, index)
+        return index
+
+    def _character_index(self) -> Dict[str, Path]:
+        """人物池索引: {人物ID: 文件路径}"""
+        return self._pool_index("characters", self.character_dir,
+                                self.character_templates_dir,
+                                "character_pool.json")
+
+    def _scenario_index(self) -> Dict[str, Path]:
+        """情境池索引: {情境ID: 文件路径}"""
+        return self._pool_index("scenarios", self.scenario_dir,
+                                self.scenario_templates_dir,
+                                "scenario_pool.json")
+
+    def list_character_ids(self) -> set:
+        """
+        列出所有可用人物ID（不解析文件内容）
+
+        Returns:
+            人物ID集合
+        """
+        return set(self._character_index())
+
+    def list_scenario_ids(self) -> set:
+        """
+        列出所有可用情境ID（不解析文件内容）
+
+        Returns:
+            情境ID集合
+        """
+        return set(self._scenario_index())
+
+    def get_random_character(self) -> Optional[Dict[str, Any]]:
+        """
+        随机获取一个人物
+
+        只解析被选中的那一个文件，而不是加载整个人物目录。
+
+        Returns:
+            随机选择的人物数据字典，如果没有可用人物则返回None
+        """
+        index = self._character_index()
+        if not index:
+            return None
+        return self.load_json_file(index[random.choice(list(index))])
+
+    def get_random_scenario(self) -> Optional[Dict[str, Any]]:
+        """
+        随机获取一个情境
+
+        只解析被选中的那一个文件，而不是加载整个情境目录。
+
+        Returns:
+            随机选择的情境数据字典，如果没有可用情境则返回None
+        """
+        index = self._scenario_index()
+        if not index:
+            return None
+        return self.load_json_file(index[random.choice(list(index))])
@@ -0,0 +1,677 @@
+"""
+数据校验器，基于JSON Schema校验人物、情境、对话等数据
+"""
+import os
+import re
+import sys
+import json
+import logging
+import functools
+from pathlib import Path
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+import jsonschema
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    _loads = orjson.loads
+except ImportError:
+    # 没有orjson时退回stdlib json，接口保持bytes进出
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+    _loads = json.loads
+
+# 可选的加速后端: fastjsonschema把schema编译成生成的Python函数，
+# jsonschema_rs走Rust原生实现，都比纯Python的jsonschema快一个量级以上
+try:
+    import fastjsonschema
+except ImportError:
+    fastjsonschema = None
+
+try:
+    import jsonschema_rs
+except ImportError:
+    jsonschema_rs = None
+
+
+# ```json代码块的单遍匹配，替代多次str.find对前缀的重复扫描
+_FENCE_RE = re.compile(r'```(?:json)?\s*(\{[\s\S]*?\})\s*```', re.IGNORECASE)
+
+# 兜底的{...}候选匹配，只在括号配平扫描拿到的片段解析失败时使用
+_JSON_CANDIDATE_RE = re.compile(r'\{[\s\S]*?\}')
+
+
+def _find_balanced_object(text: str, start: int) -> Optional[str]:
+    """
+    从start位置起找出第一个括号配平的{...}片段
+
+    单遍线性扫描，跟踪花括号深度并跳过字符串字面量内部的括号，
+    嵌套JSON也能完整取出。
+
+    Args:
+        text: 待扫描的文本
+        start: 起始位置，应指向一个左花括号；为负时直接返回None
+
+    Returns:
+        配平的JSON片段，找不到时返回None
+    """
+    if start < 0:
+        return None
+    depth = 0
+    in_string = False
+    i = start
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if in_string:
+            if ch == '\\':
+                i += 2
+                continue
+            if ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+        i += 1
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def _compile_cached(schema_json: str, backend: str) -> Any:
+    """
+    按规范化JSON字符串缓存已编译的校验器
+
+    同一个逻辑schema(包括运行时构造的)在进程内只编译一次，
+    json.dumps的开销远小于check_schema和校验器构造。
+
+    Args:
+        schema_json: sort_keys序列化后的schema字符串
+        backend: 校验后端名
+
+    Returns:
+        后端相关的已编译校验器
+    """
+    schema = json.loads(schema_json)
+    if backend == "jsonschema_rs":
+        return jsonschema_rs.JSONSchema(schema)
+    if backend == "fastjsonschema":
+        return fastjsonschema.compile(schema)
+    validator_cls = jsonschema.validators.validator_for(schema)
+    validator_cls.check_schema(schema)
+    return validator_cls(schema)
+
+
+# 内置默认schema。构造DataValidator时直接使用这些字典，
+# 常见情况下完全绕开磁盘上的JSON往返
+_DEFAULT_SCHEMAS: Dict[str, Dict[str, Any]] = {
+    "character": {
+        "type": "object",
+        "required": ["name", "gender", "age",
+                     "attachment_style", "communication_style"],
+        "properties": {
+            "id": {"type": "string"},
+            "name": {"type": "string", "minLength": 1},
+            "gender": {"enum": ["male", "female", "other"]},
+            "age": {"type": "integer", "minimum": 16, "maximum": 100},
+            "attachment_style": {
+                "enum": ["secure", "anxious", "avoidant", "fearful"]
+            },
+            "communication_style": {
+                "enum": ["assertive", "passive",
+                         "aggressive", "passive-aggressive"]
+            },
+            "personality": {
+                "type": "object",
+                "properties": {
+                    "openness": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "conscientiousness": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "extraversion": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "agreeableness": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "neuroticism": {"type": "integer", "minimum": 0, "maximum": 100},
+                },
+            },
+            "emotional_triggers": {
+                "type": "array", "items": {"type": "string"}
+            },
+            "background": {"type": "object"},
+        },
+    },
+
+    "scenario": {
+        "type": "object",
+        "required": ["title", "description"],
+        "properties": {
+            "id": {"type": "string"},
+            "title": {"type": "string", "minLength": 1},
+            "description": {"type": "string", "minLength": 1},
+            "character_perspective": {"type": "object"},
+            "partner_reality": {"type": "object"},
+        },
+    },
+
+    "dialogue": {
+        "type": "object",
+        "required": ["role", "content"],
+        "properties": {
+            "role": {"enum": ["character", "partner"]},
+            "content": {"type": "string"},
+        },
+    },
+
+    "emotion": {
+        "type": "object",
+        "required": ["mood"],
+        "properties": {
+            "mood": {"type": "number", "minimum": -1, "maximum": 1},
+            "intensity": {"enum": ["low", "medium", "high"]},
+            "triggers": {"type": "array", "items": {"type": "string"}},
+        },
+    },
+
+    "evaluation": {
+        "type": "object",
+        "required": ["cognitive_model_scores", "dialogue_quality_scores"],
+        "properties": {
+            "cognitive_model_scores": {
+                "type": "object",
+                "required": ["relevance_recognition", "nature_assessment",
+                             "attribution_analysis", "coping_ability_assessment",
+                             "emotion_recognition"],
+                "properties": {
+                    "relevance_recognition": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "nature_assessment": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "attribution_analysis": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "coping_ability_assessment": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "emotion_recognition": {"type": "integer", "minimum": 0, "maximum": 100},
+                },
+            },
+            "dialogue_quality_scores": {
+                "type": "object",
+                "required": ["naturalness", "character_consistency",
+                             "emotional_expression", "cognitive_pattern_presentation",
+                             "overall_interaction_quality"],
+                "properties": {
+                    "naturalness": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "character_consistency": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "emotional_expression": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "cognitive_pattern_presentation": {"type": "integer", "minimum": 0, "maximum": 100},
+                    "overall_interaction_quality": {"type": "integer", "minimum": 0, "maximum": 100},
+                },
+            },
+            "summary": {
+                "type": "object",
+                "properties": {
+                    "strengths": {"type": "string"},
+                    "weaknesses": {"type": "string"},
+                    "suggestions": {"type": "string"},
+                },
+            },
+        },
+    },
+}
+
+
+# 枚举约束的frozenset版本，值都做过intern: 集合探测先比指针再比哈希，
+# 替代jsonschema对enum列表的逐项线性等值比较
+_GENDERS = frozenset(map(sys.intern, ("male", "female", "other")))
+_ATTACHMENT_STYLES = frozenset(map(sys.intern,
+                                   ("secure", "anxious", "avoidant", "fearful")))
+_COMMUNICATION_STYLES = frozenset(map(sys.intern,
+                                      ("assertive", "passive", "aggressive",
+                                       "passive-aggressive")))
+_INTENSITIES = frozenset(map(sys.intern, ("low", "medium", "high")))
+_ROLES = frozenset(map(sys.intern, ("character", "partner")))
+
+_COGNITIVE_SCORE_FIELDS = ("relevance_recognition", "nature_assessment",
+                           "attribution_analysis", "coping_ability_assessment",
+                           "emotion_recognition")
+_QUALITY_SCORE_FIELDS = ("naturalness", "character_consistency",
+                         "emotional_expression", "cognitive_pattern_presentation",
+                         "overall_interaction_quality")
+_BIG_FIVE_FIELDS = ("openness", "conscientiousness", "extraversion",
+                    "agreeableness", "neuroticism")
+
+
+def _validate_evaluation_fast(data: Any) -> Tuple[bool, str]:
+    """
+    针对内置evaluation schema的直线式校验
+
+    形状已知，逐字段比较即可，绕开通用schema校验器的关键字分发。
+    bool是int的子类，类型判断用type以和jsonschema的integer语义一致。
+
+    Args:
+        data: 要校验的评估结果
+
+    Returns:
+        (是否通过, 错误信息)的元组
+    """
+    if not isinstance(data, dict):
+        return False, "评估结果不是对象"
+    for block_key, fields in (("cognitive_model_scores", _COGNITIVE_SCORE_FIELDS),
+                              ("dialogue_quality_scores", _QUALITY_SCORE_FIELDS)):
+        block = data.get(block_key)
+        if not isinstance(block, dict):
+            return False, f"{block_key}缺失或不是对象"
+        for field in fields:
+            value = block.get(field)
+            if type(value) is not int or value < 0 or value > 100:
+                return False, f"{block_key}.{field}应为0-100的整数"
+    summary = data.get("summary")
+    if summary is not None:
+        if not isinstance(summary, dict):
+            return False, "summary不是对象"
+        for field in ("strengths", "weaknesses", "suggestions"):
+            value = summary.get(field)
+            if value is not None and not isinstance(value, str):
+                return False, f"summary.{field}应为字符串"
+    return True, ""
+
+
+class DataValidator:
+    """
+    数据校验器，用JSON Schema校验各类数据
+
+    默认直接使用内置schema；指定schemas_dir时会从目录中加载
+    {schema_type}_schema.json覆盖同名默认schema。
+    支持的schema_type: character、scenario、dialogue、emotion、evaluation
+    """
+
+    # 属性集合固定，省掉实例__dict__，属性访问走更紧凑的slot描述符
+    __slots__ = ("logger", "schemas_dir", "backend", "schemas",
+                 "_validation_error", "_validators", "_result_cache",
+                 "validate_scenario")
+
+    # 纯转发的校验方法在__init__里按类型生成partial，
+    # 比def包装少一层Python调用帧；带快速路径的类型仍用普通方法
+    _FORWARDED_TYPES = ("scenario",)
+
+    # 结果记忆化缓存的容量上限
+    _RESULT_CACHE_SIZE = 1024
+
+    _SCHEMA_TYPES = ("character", "scenario", "dialogue", "emotion", "evaluation")
+
+    # 已确认存在的schema目录，跨实例共享，避免每次实例化都mkdir一遍
+    _known_dirs: set = set()
+
+    def __init__(self, schemas_dir: Optional[str] = None,
+                 backend: Optional[str] = None):
+        """
+        初始化数据校验器
+
+        Args:
+            schemas_dir: schema文件目录，缺省时直接使用内置默认schema，
+                完全不读写磁盘；传入目录时其中的文件覆盖同名默认schema
+            backend: 校验后端，jsonschema_rs/fastjsonschema/jsonschema，
+                缺省时自动选择已安装的最快后端
+        """
+        self.logger = logging.getLogger("lebench.data_validator")
+
+        if backend is None:
+            if jsonschema_rs is not None:
+                backend = "jsonschema_rs"
+            elif fastjsonschema is not None:
+                backend = "fastjsonschema"
+            else:
+                backend = "jsonschema"
+        self.backend = backend
+        if backend == "jsonschema_rs":
+            self._validation_error = jsonschema_rs.ValidationError
+        elif backend == "fastjsonschema":
+            self._validation_error = fastjsonschema.JsonSchemaException
+        else:
+            self._validation_error = jsonschema.ValidationError
+
+        # 默认schema常驻内存，常见情况下不做任何JSON文件往返
+        self.schemas: Dict[str, Dict[str, Any]] = dict(_DEFAULT_SCHEMAS)
+        self.schemas_dir: Optional[Path] = None
+        if schemas_dir is not None:
+            self.schemas_dir = Path(schemas_dir)
+            if self.schemas_dir not in DataValidator._known_dirs:
+                self.schemas_dir.mkdir(parents=True, exist_ok=True)
+                DataValidator._known_dirs.add(self.schemas_dir)
+
+            # 一次scandir拿到目录下全部文件名，替代每个schema各一次stat
+            existing = {entry.name for entry in os.scandir(self.schemas_dir)}
+            self._initialize_default_schemas(existing)
+            for schema_type in self._SCHEMA_TYPES:
+                name = f"{schema_type}_schema.json"
+                if name not in existing:
+                    continue
+                with open(self.schemas_dir / name, 'r', encoding='utf-8') as f:
+                    self.schemas[schema_type] = json.load(f)
+
+        # 每种schema只编译一次校验器后复用。jsonschema.validate()
+        # 每次调用都会重跑check_schema并重建校验器，纯Python开销很大
+        self._validators: Dict[str, Any] = {
+            schema_type: self._compile_schema(schema)
+            for schema_type, schema in self.schemas.items()
+        }
+
+        # 校验结果按数据对象身份记忆化: {(id(data), schema_type): (data, 结果)}。
+        # 值里保留data的强引用，缓存期内id不会被复用，命中时再按身份核对
+        self._result_cache: "OrderedDict[Tuple[int, str], Tuple[Any, Tuple[bool, str]]]" = OrderedDict()
+
+        for schema_type in self._FORWARDED_TYPES:
+            setattr(self, f"validate_{schema_type}",
+                    functools.partial(self.validate_data, schema_type=schema_type))
+
+    def _compile_schema(self, schema: Dict[str, Any]) -> Any:
+        """
+        用当前后端编译schema，语义相同的schema命中进程级缓存
+
+        Args:
+            schema: JSON Schema字典
+
+        Returns:
+            后端相关的已编译校验器
+        """
+        key = json.dumps(schema, sort_keys=True, ensure_ascii=False)
+        return _compile_cached(key, self.backend)
+
+    def validate_data(self, data: Dict[str, Any], schema_type: str) -> Tuple[bool, str]:
+        """
+        用指定类型的schema校验数据
+
+        同一个数据对象的重复校验(重试、多阶段传递)直接命中记忆化
+        缓存。调用方不应在校验后原地修改已通过校验的数据。
+
+        Args:
+            data: 要校验的数据
+            schema_type: schema类型
+
+        Returns:
+            (是否通过, 错误信息)的元组，通过时错误信息为空字符串
+        """
+        key = (id(data), schema_type)
+        hit = self._result_cache.get(key)
+        if hit is not None and hit[0] is data:
+            self._result_cache.move_to_end(key)
+            return hit[1]
+        result = self._validate_uncached(data, schema_type)
+        self._result_cache[key] = (data, result)
+        if len(self._result_cache) > self._RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+        return result
+
+    def _validate_uncached(self, data: Dict[str, Any],
+                           schema_type: str) -> Tuple[bool, str]:
+        """
+        不经过结果缓存的校验，validate_data的实际实现
+
+        Args:
+            data: 要校验的数据
+            schema_type: schema类型
+
+        Returns:
+            (是否通过, 错误信息)的元组
+        """
+        validator = self._validators.get(schema_type)
+        if validator is None:
+            return False, f"未知的schema类型: {schema_type}"
+        if self.backend == "fastjsonschema":
+            # fastjsonschema的编译函数没有is_valid，只能走异常路径
+            try:
+                validator(data)
+            except self._validation_error as e:
+                msg = getattr(e, 'message', str(e))
+                # %占位符延迟格式化，级别被过滤时不做任何字符串拼接
+                if self.logger.isEnabledFor(logging.WARNING):
+                    self.logger.warning("验证失败: %s", msg)
+                return False, msg
+            return True, ""
+        # 成功路径只做一次树遍历，不构造ValidationError也不格式化消息
+        if validator.is_valid(data):
+            return True, ""
+        error = next(iter(validator.iter_errors(data)), None)
+        msg = error.message if error is not None else "未知校验错误"
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning("验证失败: %s", msg)
+        return False, msg
+
+    def is_valid(self, data: Dict[str, Any], schema_type: str) -> bool:
+        """
+        只返回是否通过校验，不构造错误信息
+
+        只需要布尔结果的调用方应优先使用本方法，
+        通过时完全跳过错误对象的分配和格式化。
+
+        Args:
+            data: 要校验的数据
+            schema_type: schema类型
+
+        Returns:
+            数据是否通过校验
+        """
+        validator = self._validators.get(schema_type)
+        if validator is None:
+            return False
+        if self.backend == "fastjsonschema":
+            try:
+                validator(data)
+            except self._validation_error:
+                return False
+            return True
+        return validator.is_valid(data)
+
+    def validate_with_schema(self, data: Dict[str, Any],
+                             schema: Dict[str, Any]) -> Tuple[bool, str]:
+        """
+        用运行时构造的schema校验数据，重复使用的schema不会重复编译
+
+        Args:
+            data: 要校验的数据
+            schema: JSON Schema字典
+
+        Returns:
+            (是否通过, 错误信息)的元组
+        """
+        validator = self._compile_schema(schema)
+        try:
+            if self.backend == "fastjsonschema":
+                validator(data)
+            else:
+                validator.validate(data)
+        except self._validation_error as e:
+            msg = getattr(e, 'message', str(e))
+            return False, msg
+        return True, ""
+
+    def validate_character(self, data: Dict[str, Any]) -> Tuple[bool, str]:
+        """校验人物数据"""
+        # 大五人格整数先走直线比较链快速拒绝，再交给通用校验器
+        if (self.schemas.get("character") is _DEFAULT_SCHEMAS["character"]
+                and isinstance(data, dict)):
+            for field, legal in (("gender", _GENDERS),
+                                 ("attachment_style", _ATTACHMENT_STYLES),
+                                 ("communication_style", _COMMUNICATION_STYLES)):
+                value = data.get(field)
+                if isinstance(value, str) and sys.intern(value) not in legal:
+                    return False, f"{field}取值非法: {value}"
+            personality = data.get("personality")
+            if isinstance(personality, dict):
+                for field in _BIG_FIVE_FIELDS:
+                    value = personality.get(field)
+                    if value is not None and (
+                            type(value) is not int or value < 0 or value > 100):
+                        return False, f"personality.{field}应为0-100的整数"
+        return self.validate_data(data, "character")
+
+    def validate_dialogue_entry(self, data: Dict[str, Any]) -> Tuple[bool, str]:
+        """校验单条对话数据"""
+        if (self.schemas.get("dialogue") is _DEFAULT_SCHEMAS["dialogue"]
+                and isinstance(data, dict)):
+            role = data.get("role")
+            if isinstance(role, str) and sys.intern(role) not in _ROLES:
+                return False, f"role取值非法: {role}"
+        return self.validate_data(data, "dialogue")
+
+    def validate_emotion_data(self, data: Dict[str, Any]) -> Tuple[bool, str]:
+        """校验情绪数据"""
+        if (self.schemas.get("emotion") is _DEFAULT_SCHEMAS["emotion"]
+                and isinstance(data, dict)):
+            intensity = data.get("intensity")
+            if isinstance(intensity, str) and sys.intern(intensity) not in _INTENSITIES:
+                return False, f"intensity取值非法: {intensity}"
+        return self.validate_data(data, "emotion")
+
+    def validate_evaluation_result(self, data: Dict[str, Any]) -> Tuple[bool, str]:
+        """校验专家评估结果"""
+        # 内置schema形状固定，直线检查即可；
+        # 用户通过schemas_dir覆盖过schema时仍走通用校验器
+        if self.schemas.get("evaluation") is _DEFAULT_SCHEMAS["evaluation"]:
+            return _validate_evaluation_fast(data)
+        return self.validate_data(data, "evaluation")
+
+    def validate_batch(self, items: List[Dict[str, Any]],
+                       schema_type: str) -> List[Tuple[bool, str]]:
+        """
+        批量校验同类型数据
+
+        Rust后端在原生代码中校验时会释放GIL，多条数据用线程池
+        并行校验能接近线性加速；纯Python后端受GIL限制，线程反而
+        增加开销，直接串行处理。
+
+        Args:
+            items: 要校验的数据列表
+            schema_type: schema类型
+
+        Returns:
+            与items顺序对应的(是否通过, 错误信息)列表
+        """
+        if self.backend == "jsonschema_rs" and len(items) > 1:
+            with ThreadPoolExecutor() as executor:
+                return list(executor.map(
+                    lambda item: self.validate_data(item, schema_type), items))
+        return [self.validate_data(item, schema_type) for item in items]
+
+    def validate_api_response(self, response: Dict[str, Any]) -> Tuple[bool, str]:
+        """
+        校验API响应是否包含可用的消息内容
+
+        Args:
+            response: API原始响应
+
+        Returns:
+            (是否可用, 错误信息)的元组
+        """
+        # 直接按期望路径取值，成功路径一条直线走完，
+        # 缺字段时靠异常兜底，省掉逐层的in/isinstance检查
+        try:
+            content = response["choices"][0]["message"]["content"]
+        except (KeyError, IndexError, TypeError):
+            return False, "API响应缺少choices[0].message.content字段"
+        if not isinstance(content, str):
+            return False, "API响应content不是字符串"
+        return True, ""
+
+    def validate_json_string(self, json_str: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        校验字符串是否为合法JSON
+
+        Args:
+            json_str: JSON字符串
+
+        Returns:
+            (是否合法, 解析结果)的元组，不合法时解析结果为None
+        """
+        try:
+            data = _loads(json_str)
+        except ValueError as e:
+            if self.logger.isEnabledFor(logging.WARNING):
+                self.logger.warning("JSON解析失败: %s", e)
+            return False, None
+        return True, data
+
+    def extract_json_from_llm_response(self, response_text: str) -> Optional[Dict[str, Any]]:
+        """
+        从LLM响应文本中提取JSON对象
+
+        依次尝试: ```json代码块、直接解析、括号配平的{...}片段
+
+        Args:
+            response_text: LLM响应文本
+
+        Returns:
+            解析出的JSON对象，全部失败时返回None
+        """
+        # 代码块用单个预编译正则一遍定位，替代逐段str.find；
+        # orjson的JSONDecodeError是ValueError子类，异常捕获统一按ValueError
+        fence = _FENCE_RE.search(response_text)
+        if fence is not None:
+            try:
+                return _loads(fence.group(1))
+            except ValueError:
+                pass
+
+        try:
+            return _loads(response_text)
+        except ValueError:
+            pass
+
+        # 括号配平扫描替代懒惰正则: O(n)单遍找到最外层完整对象，
+        # 只把一个候选交给解析器，嵌套JSON也不会被截断
+        candidate = _find_balanced_object(response_text, response_text.find('{'))
+        if candidate is not None:
+            try:
+                return _loads(candidate)
+            except ValueError:
+                pass
+            # 第一个配平片段不是合法JSON时才逐个尝试剩余候选
+            for match in _JSON_CANDIDATE_RE.finditer(response_text):
+                try:
+                    return _loads(match.group())
+                except ValueError:
+                    continue
+        return None
+
+    def _initialize_default_schemas(self, existing: set) -> None:
+        """
+        把缺失的默认schema文件写到schemas_dir，已存在的文件不会被覆盖
+
+        Args:
+            existing: schemas_dir下已有的文件名集合，写出的文件会补进该集合
+        """
+        missing = [
+            schema_type for schema_type in self._SCHEMA_TYPES
+            if f"{schema_type}_schema.json" not in existing
+        ]
+        if not missing:
+            return
+
+        for schema_type in missing:
+            name = f"{schema_type}_schema.json"
+            with open(self.schemas_dir / name, 'wb') as f:
+                f.write(_dumps(_DEFAULT_SCHEMAS[schema_type]))
+            existing.add(name)
+
+
+@functools.lru_cache(maxsize=None)
+def get_validator(schemas_dir: Optional[str] = None,
+                  backend: Optional[str] = None) -> DataValidator:
+    """
+    返回进程内共享的DataValidator实例
+
+    每个(schemas_dir, backend)组合只构造一次，schema文件读取
+    和校验器编译成为一次性的启动开销，调用方直接用本工厂
+    代替自行实例化。
+
+    Args:
+        schemas_dir: schema文件目录
+        backend: 校验后端，含义同DataValidator
+
+    Returns:
+        共享的DataValidator实例
+    """
+    return DataValidator(schemas_dir=schemas_dir, backend=backend)
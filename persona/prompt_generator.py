@@ -0,0 +1,611 @@
+"""
+提示词生成器，基于JSON模板为各类Agent构建提示词
+"""
+import json
+import string
+import types
+import asyncio
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import orjson
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+except ImportError:
+    # 没有orjson时退回stdlib json，接口保持bytes进出
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+
+
+# 伴侣提示词的沟通建议查表。顺序即匹配优先级，
+# 命中第一个子串后停止，替代逐次substring扫描的if/elif链
+_ATTACHMENT_TIPS = (
+    ("anxious", "- 对焦虑型依恋的伴侣，给予更多确认和安全感"),
+    ("avoidant", "- 对回避型依恋的伴侣，给予空间，避免施压"),
+    ("secure", "- 对安全型依恋的伴侣，保持坦诚直接的交流"),
+    ("fearful", "- 对恐惧型依恋的伴侣，保持耐心和稳定的态度"),
+)
+_COMM_TIPS = (
+    ("passive-aggressive", "- 对被动攻击的沟通方式，温和地点明潜在的情绪"),
+    ("passive_aggressive", "- 对被动攻击的沟通方式，温和地点明潜在的情绪"),
+    ("passive", "- 对被动的沟通方式，主动询问真实想法"),
+    ("aggressive", "- 对攻击性的沟通方式，保持冷静，不升级冲突"),
+    ("assertive", "- 对坚定自信的沟通方式，进行对等坦率的交流"),
+)
+
+
+class PromptGenerator:
+    """
+    提示词生成器，从模板目录加载各Agent的提示词模板并填充人物/情境数据
+
+    模板文件位于templates_dir下，命名为{agent_type}_template.json，
+    支持的agent_type: character、partner、emotion、memory、expert
+    """
+
+    # 专家类型常量，提升到类级别避免每次生成提示词时重建字典
+    _EXPERT_DESCRIPTIONS = {
+        "psychologist": "你精通认知心理学和依恋理论，擅长分析个体的认知模式和情绪反应。",
+        "relationship_counselor": "你有丰富的亲密关系咨询经验，擅长评估伴侣间的互动模式。",
+        "communication_expert": "你专注于人际沟通研究，擅长评估对话中的沟通质量和有效性。",
+    }
+    _EXPERT_CHINESE = {
+        "psychologist": "心理学家",
+        "relationship_counselor": "亲密关系咨询师",
+        "communication_expert": "沟通专家",
+    }
+
+    # 已确认存在的模板目录，跨实例共享，避免每次实例化都mkdir一遍
+    _verified_dirs: set = set()
+
+    def __init__(self, templates_dir: str = "data/templates"):
+        """
+        初始化提示词生成器
+
+        Args:
+            templates_dir: 模板目录
+        """
+        self.templates_dir = Path(templates_dir)
+        if self.templates_dir not in PromptGenerator._verified_dirs:
+            self.templates_dir.mkdir(parents=True, exist_ok=True)
+            PromptGenerator._verified_dirs.add(self.templates_dir)
+
+        # 已知Agent类型的模板路径只构造一次，
+        # 免去热路径上的f-string和Path拼接
+        self._template_paths: Dict[str, Path] = {
+            agent_type: self.templates_dir / f"{agent_type}_template.json"
+            for agent_type in _DEFAULT_TEMPLATE_BUILDERS
+        }
+
+        # 模板内存缓存，避免每次生成提示词都重新读盘解析
+        self._template_cache: Dict[str, Dict[str, Any]] = {}
+
+        # 模板字段的预解析段列表缓存: {(agent_type, 字段名): 段元组}
+        # str.format每次调用都要重新解析格式串，这里只解析一次
+        self._segment_cache: Dict[Tuple[str, str], tuple] = {}
+
+        # 生成结果缓存: {(提示词种类, 人物ID, 情境ID[, 专家类型]): 提示词}
+        # 同一人物+情境组合在一轮对话中会反复构建相同的提示词
+        self._prompt_cache: Dict[Tuple, Any] = {}
+
+        # 专家系统提示词缓存: {专家类型: 渲染结果}
+        # 系统提示词只依赖专家类型，与人物/情境无关
+        self._expert_cache: Dict[str, str] = {}
+
+        self._initialize_default_templates()
+
+    def load_template(self, agent_type: str) -> Dict[str, Any]:
+        """
+        加载指定Agent的提示词模板，命中缓存时不做任何I/O
+
+        Args:
+            agent_type: Agent类型
+
+        Returns:
+            模板的只读视图
+        """
+        cached = self._template_cache.get(agent_type)
+        if cached is not None:
+            return cached
+
+        template_path = self._template_path(agent_type)
+        with open(template_path, 'rb') as f:
+            template = _loads(f.read())
+
+        # 缓存对象在调用方之间共享，返回只读视图防止被就地修改；
+        # 修改模板必须走save_template
+        proxy = types.MappingProxyType(template)
+        self._template_cache[agent_type] = proxy
+        return proxy
+
+    async def load_template_async(self, agent_type: str) -> Dict[str, Any]:
+        """
+        load_template的异步版本，供协程调用方使用
+
+        缓存命中时直接返回；未命中时把阻塞的读盘+解析移到线程池，
+        不会卡住事件循环。
+
+        Args:
+            agent_type: Agent类型
+
+        Returns:
+            模板的只读视图
+        """
+        cached = self._template_cache.get(agent_type)
+        if cached is not None:
+            return cached
+        return await asyncio.to_thread(self.load_template, agent_type)
+
+    async def save_template_async(self, agent_type: str, template: Dict[str, Any]) -> None:
+        """
+        save_template的异步版本
+
+        Args:
+            agent_type: Agent类型
+            template: 模板字典
+        """
+        await asyncio.to_thread(self.save_template, agent_type, template)
+
+    def _template_path(self, agent_type: str) -> Path:
+        """
+        获取指定Agent类型的模板文件路径
+
+        Args:
+            agent_type: Agent类型
+
+        Returns:
+            模板文件路径
+        """
+        path = self._template_paths.get(agent_type)
+        if path is None:
+            path = self.templates_dir / f"{agent_type}_template.json"
+            self._template_paths[agent_type] = path
+        return path
+
+    def _render(self, agent_type: str, field: str, mapping: Dict[str, Any]) -> str:
+        """
+        按预解析的段列表渲染模板字段
+
+        首次渲染时用string.Formatter().parse把格式串拆成
+        (字面量, 字段名, 格式说明, 转换)的段元组并缓存，
+        之后的渲染只做字典查找和字符串拼接。
+
+        Args:
+            agent_type: Agent类型
+            field: 模板中的字段名，如"system_prefix"
+            mapping: 占位符到值的映射
+
+        Returns:
+            渲染后的字符串
+        """
+        cache_key = (agent_type, field)
+        segments = self._segment_cache.get(cache_key)
+        if segments is None:
+            segments = tuple(string.Formatter().parse(
+                self.load_template(agent_type)[field]))
+            self._segment_cache[cache_key] = segments
+
+        parts = []
+        for literal, field_name, format_spec, conversion in segments:
+            if literal:
+                parts.append(literal)
+            if field_name is not None:
+                value = mapping[field_name]
+                if conversion == 's':
+                    value = str(value)
+                elif conversion == 'r':
+                    value = repr(value)
+                if format_spec:
+                    parts.append(format(value, format_spec))
+                else:
+                    parts.append(value if isinstance(value, str) else str(value))
+        return "".join(parts)
+
+    def save_template(self, agent_type: str, template: Dict[str, Any]) -> None:
+        """
+        保存模板并刷新缓存
+
+        Args:
+            agent_type: Agent类型
+            template: 模板字典
+        """
+        template_path = self._template_path(agent_type)
+        with open(template_path, 'wb') as f:
+            f.write(_dumps(template))
+        self._template_cache[agent_type] = types.MappingProxyType(dict(template))
+        # 模板内容变化后，预解析的段列表和已生成的提示词都需要重建
+        for key in [k for k in self._segment_cache if k[0] == agent_type]:
+            del self._segment_cache[key]
+        self._prompt_cache.clear()
+        self._expert_cache.clear()
+
+    def _initialize_default_templates(self) -> None:
+        """
+        初始化默认模板文件，已存在的文件不会被覆盖
+
+        先检查哪些模板文件缺失，全部存在时直接返回，
+        不再构造任何默认模板字典。
+        """
+        missing = [
+            agent_type for agent_type in _DEFAULT_TEMPLATE_BUILDERS
+            if not self._template_path(agent_type).exists()
+        ]
+        if not missing:
+            return
+
+        def _write(agent_type: str) -> None:
+            template_path = self._template_path(agent_type)
+            with open(template_path, 'wb') as f:
+                f.write(_default_template_bytes(agent_type))
+
+        if len(missing) == 1:
+            _write(missing[0])
+        else:
+            # 首次冷启动时五个模板并发写出，总耗时接近单次写的延迟
+            with ThreadPoolExecutor(max_workers=len(missing)) as executor:
+                list(executor.map(_write, missing))
+
+
+    def prepare_context(self,
+                        character: Dict[str, Any],
+                        scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        把人物和情境的字段提取一次，供同一轮对话中的多个生成方法复用
+
+        Args:
+            character: 人物数据
+            scenario: 情境数据
+
+        Returns:
+            包含所有模板替换值的上下文字典
+        """
+        # 嵌套字典只取一次，避免每个字段都走一遍.get链并分配空字典
+        bg = character.get('background') or {}
+        persp = scenario.get('character_perspective') or {}
+        reality = scenario.get('partner_reality') or {}
+
+        name = character.get('name', '未命名')
+        attachment_style = character.get('attachment_style', '未指定')
+        communication_style = character.get('communication_style', '未指定')
+
+        return {
+            'character_id': character.get('id'),
+            'scenario_id': scenario.get('id'),
+            'name': name,
+            'gender': character.get('gender', '未指定'),
+            'age': character.get('age', '未指定'),
+            'attachment_style': attachment_style,
+            'communication_style': communication_style,
+            'background_description': (
+                f"- 童年: {bg.get('childhood', '未知')}\n"
+                f"- 教育: {bg.get('education', '未知')}\n"
+                f"- 职业: {bg.get('career', '未知')}\n"
+                f"- 兴趣爱好: {', '.join(bg.get('hobbies', []))}"
+            ),
+            'perspective_description': (
+                f"- 感受: {persp.get('feelings', '未知')}\n"
+                f"- 想法: {persp.get('thoughts', '未知')}\n"
+                f"- 期望: {persp.get('expectations', '未知')}"
+            ),
+            'scenario_description': scenario.get('description', ''),
+            'partner_reality': reality.get('perspective', '未知'),
+            'character_info': (
+                f"- 姓名: {name}\n"
+                f"- 依恋类型: {attachment_style}\n"
+                f"- 沟通风格: {communication_style}"
+            ),
+            'scenario_info': (
+                f"- 标题: {scenario.get('title', '未命名')}\n"
+                f"- 描述: {scenario.get('description', '无')}"
+            ),
+            'emotional_triggers': character.get('emotional_triggers', []),
+        }
+
+    def generate_character_prompt(self,
+                                  character: Dict[str, Any],
+                                  scenario: Dict[str, Any],
+                                  ctx: Optional[Dict[str, Any]] = None) -> str:
+        """
+        生成虚拟人物的系统提示词
+
+        Args:
+            character: 人物数据
+            scenario: 情境数据
+            ctx: prepare_context预先算好的上下文，缺省时内部计算
+
+        Returns:
+            填充后的系统提示词
+        """
+        if ctx is None:
+            ctx = self.prepare_context(character, scenario)
+        cache_key = ("character", ctx['character_id'], ctx['scenario_id'])
+        if None not in cache_key:
+            cached = self._prompt_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        prompt = self._render("character", "system_prefix", ctx)
+        if None not in cache_key:
+            self._prompt_cache[cache_key] = prompt
+        return prompt
+
+    def generate_partner_prompt(self,
+                                character: Dict[str, Any],
+                                scenario: Dict[str, Any],
+                                ctx: Optional[Dict[str, Any]] = None) -> str:
+        """
+        生成伴侣角色的系统提示词
+
+        Args:
+            character: 人物数据
+            scenario: 情境数据
+            ctx: prepare_context预先算好的上下文，缺省时内部计算
+
+        Returns:
+            填充后的系统提示词
+        """
+        if ctx is None:
+            ctx = self.prepare_context(character, scenario)
+        cache_key = ("partner", ctx['character_id'], ctx['scenario_id'])
+        if None not in cache_key:
+            cached = self._prompt_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        attachment_style = ctx['attachment_style'].lower()
+        communication_style = ctx['communication_style'].lower()
+
+        tips = []
+        for key, tip in _ATTACHMENT_TIPS:
+            if key in attachment_style:
+                tips.append(tip)
+                break
+        for key, tip in _COMM_TIPS:
+            if key in communication_style:
+                tips.append(tip)
+                break
+
+        communication_tips = "\n".join(tips) if tips else "- 自然真诚地交流"
+
+        prompt = self._render("partner", "system_prefix", {
+            'name': ctx['name'],
+            'scenario_description': ctx['scenario_description'],
+            'partner_reality': ctx['partner_reality'],
+            'communication_tips': communication_tips,
+        })
+        if None not in cache_key:
+            self._prompt_cache[cache_key] = prompt
+        return prompt
+
+    def generate_emotion_prompt(self,
+                                character: Dict[str, Any],
+                                dialogue_history: List[Dict[str, str]],
+                                ctx: Optional[Dict[str, Any]] = None) -> str:
+        """
+        生成情绪评估提示词
+
+        Args:
+            character: 人物数据
+            dialogue_history: 对话历史
+            ctx: prepare_context预先算好的上下文，缺省时直接读character
+
+        Returns:
+            填充后的提示词
+        """
+        if ctx is not None:
+            name = ctx['name']
+            triggers = ctx['emotional_triggers']
+        else:
+            name = character.get('name', '未命名')
+            triggers = character.get('emotional_triggers', [])
+        emotional_triggers = "、".join(triggers) if triggers else "未知"
+
+        return self._render("emotion", "system_prefix", {
+            'name': name,
+            'emotional_triggers': emotional_triggers,
+            'dialogue_text': self.format_dialogue_history(
+                dialogue_history, character.get('name')),
+        })
+
+    def generate_expert_prompt(self,
+                               expert_type: str,
+                               character: Dict[str, Any],
+                               scenario: Dict[str, Any],
+                               ctx: Optional[Dict[str, Any]] = None) -> Tuple[str, str]:
+        """
+        生成专家评估的提示词
+
+        Args:
+            expert_type: 专家类型
+            character: 人物数据
+            scenario: 情境数据
+            ctx: prepare_context预先算好的上下文，缺省时内部计算
+
+        Returns:
+            (系统提示词, 用户消息前缀)的元组
+        """
+        if ctx is None:
+            ctx = self.prepare_context(character, scenario)
+        cache_key = ("expert", expert_type, ctx['character_id'], ctx['scenario_id'])
+        if None not in cache_key:
+            cached = self._prompt_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        # 系统提示词只依赖专家类型，每个类型渲染一次后复用
+        system_prompt = self._expert_cache.get(expert_type)
+        if system_prompt is None:
+            system_prompt = self._render("expert", "system_prefix", {
+                'expert_chinese_type': self._EXPERT_CHINESE.get(expert_type, "心理学家"),
+                'expert_description': self._EXPERT_DESCRIPTIONS.get(
+                    expert_type, self._EXPERT_DESCRIPTIONS["psychologist"]),
+            })
+            self._expert_cache[expert_type] = system_prompt
+        user_prefix = self._render("expert", "user_prefix", ctx)
+        result = (system_prompt, user_prefix)
+        if None not in cache_key:
+            self._prompt_cache[cache_key] = result
+        return result
+
+    def format_dialogue_history(self,
+                                dialogue_history: List[Dict[str, str]],
+                                character_name: Optional[str] = None) -> str:
+        """
+        将对话历史格式化为可读文本
+
+        Args:
+            dialogue_history: 对话历史，每条包含role和content
+            character_name: 角色名字，用于标注发言人
+
+        Returns:
+            格式化后的对话文本
+        """
+        # 两个发言人标签只拼一次，循环内只剩字典取值和串接
+        char_label = (character_name or "角色") + "："
+        partner_label = "伴侣："
+        return "\n".join(
+            (char_label if entry["role"] == "character" else partner_label)
+            + entry["content"]
+            for entry in dialogue_history
+        )
+
+
+def _build_character_template() -> Dict[str, Any]:
+    """默认的虚拟人物模板"""
+    return {
+        "system_prefix": (
+            "你将扮演一个虚拟人物，基于以下设定进行对话。\n"
+            "\n"
+            "## 人物基本信息\n"
+            "- 名字: {name}\n"
+            "- 性别: {gender}\n"
+            "- 年龄: {age}\n"
+            "- 依恋类型: {attachment_style}\n"
+            "- 沟通风格: {communication_style}\n"
+            "\n"
+            "## 人物背景\n"
+            "{background_description}\n"
+            "\n"
+            "## 当前情境\n"
+            "{scenario_description}\n"
+            "\n"
+            "## 角色视角\n"
+            "{perspective_description}\n"
+            "\n"
+            "请完全代入这个角色，用符合其背景、依恋类型和沟通风格的方式回应。"
+        ),
+        "reminder": "保持角色一致性，不要跳出角色。"
+    }
+
+
+def _build_partner_template() -> Dict[str, Any]:
+    """默认的伴侣模板"""
+    return {
+        "system_prefix": (
+            "你将扮演{name}的伴侣，基于以下信息进行对话。\n"
+            "\n"
+            "## 当前情境\n"
+            "{scenario_description}\n"
+            "\n"
+            "## 伴侣视角的实际情况\n"
+            "{partner_reality}\n"
+            "\n"
+            "## 沟通建议\n"
+            "{communication_tips}\n"
+            "\n"
+            "请自然地回应，体现出对伴侣状态的理解。"
+        ),
+        "reminder": "回应要贴近真实亲密关系中的交流。"
+    }
+
+
+def _build_emotion_template() -> Dict[str, Any]:
+    """默认的情绪评估模板"""
+    return {
+        "system_prefix": (
+            "请评估{name}在以下对话中的情绪状态。\n"
+            "\n"
+            "## 情绪触发点\n"
+            "{emotional_triggers}\n"
+            "\n"
+            "## 对话记录\n"
+            "{dialogue_text}\n"
+            "\n"
+            "请返回一个-1到1之间的情绪分数，并简要说明依据。"
+        ),
+        "reminder": "只关注角色本人的情绪，而非伴侣的情绪。"
+    }
+
+
+def _build_memory_template() -> Dict[str, Any]:
+    """默认的记忆总结模板"""
+    return {
+        "system_prefix": (
+            "请为{name}总结以下对话中值得记住的要点。\n"
+            "\n"
+            "## 对话记录\n"
+            "{dialogue_text}\n"
+            "\n"
+            "请用简短的条目列出关键信息、情绪变化和未解决的问题。"
+        ),
+        "reminder": "总结应当简洁，保留对后续对话有用的信息。"
+    }
+
+
+def _build_expert_template() -> Dict[str, Any]:
+    """默认的专家评估模板"""
+    return {
+        "system_prefix": (
+            "你是一位{expert_chinese_type}。\n"
+            "\n"
+            "{expert_description}\n"
+            "\n"
+            "请基于你的专业视角进行分析和评估。"
+        ),
+        "user_prefix": (
+            "## 人物信息\n"
+            "{character_info}\n"
+            "\n"
+            "## 情境信息\n"
+            "{scenario_info}"
+        )
+    }
+
+
+# 各Agent类型的默认模板构造函数，只有对应文件缺失时才会被调用
+_DEFAULT_TEMPLATE_BUILDERS = {
+    "character": _build_character_template,
+    "partner": _build_partner_template,
+    "emotion": _build_emotion_template,
+    "memory": _build_memory_template,
+    "expert": _build_expert_template,
+}
+
+# 默认模板序列化结果的缓存。内容是常量，
+# 每种模板在进程内只构造和序列化一次
+_DEFAULT_TEMPLATE_BYTES: Dict[str, bytes] = {}
+
+
+def _default_template_bytes(agent_type: str) -> bytes:
+    """
+    返回默认模板的序列化字节，首次调用时惰性计算并缓存
+
+    Args:
+        agent_type: Agent类型
+
+    Returns:
+        默认模板的JSON字节
+    """
+    data = _DEFAULT_TEMPLATE_BYTES.get(agent_type)
+    if data is None:
+        data = _dumps(_DEFAULT_TEMPLATE_BUILDERS[agent_type]())
+        _DEFAULT_TEMPLATE_BYTES[agent_type] = data
+    return data
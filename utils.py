@@ -3,9 +3,313 @@
 """
 import json
 import os
+import re
+import sys
+import time
+import uuid
+import secrets
+import bisect
 import datetime
+from collections import Counter
 from typing import Dict, List, Any, Optional
 
+try:
+    # orjson的C解析器在多MB的对话日志上比stdlib快数倍
+    import orjson
+    _loads = orjson.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _loads = json.loads
+
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+# 预编译的正则模式。re模块虽然会缓存编译结果，
+# 但每次调用仍要做一次字符串哈希查找，热路径上直接持有编译对象更快
+_WS_RE = re.compile(r'\s+')
+_WORD_RE = re.compile(r'\w+')
+
+# 关键词提取的停用词，frozenset常量只在导入时构造一次
+_STOP_WORDS = frozenset('的 了 和 是 在 有 我 你 他 她 它 这 那 都 也 就'.split())
+_UNSAFE_RE = re.compile(r'[\\/*?:"<>|]')
+_FENCE_RE = re.compile(r'```(?:json)?\s*(\{.*?\})\s*```', re.DOTALL)
+
+
+def _balanced_json_spans(text: str):
+    """
+    线性扫描文本，依次产出每个顶层配平的{...}片段
+
+    用计数器做花括号配平（并跳过字符串字面量内的括号），
+    复杂度为O(n)，不会像回溯正则那样在畸形输出上退化。
+
+    Args:
+        text: 待扫描文本
+
+    Yields:
+        配平的JSON候选片段
+    """
+    depth = 0
+    start = -1
+    in_string = False
+    escaped = False
+    for i, ch in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == '\\':
+                escaped = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"' and depth > 0:
+            in_string = True
+        elif ch == '{':
+            if depth == 0:
+                start = i
+            depth += 1
+        elif ch == '}' and depth > 0:
+            depth -= 1
+            if depth == 0:
+                yield text[start:i + 1]
+
+
+def clean_text(text: str) -> str:
+    """
+    清理文本，合并多余空白字符
+
+    Args:
+        text: 原始文本
+
+    Returns:
+        清理后的文本
+    """
+    return _WS_RE.sub(' ', text).strip()
+
+
+def extract_json_from_text(text: str) -> Optional[Dict[str, Any]]:
+    """
+    从文本中提取JSON对象，支持markdown代码块包裹的形式
+
+    Args:
+        text: 可能包含JSON的文本（如LLM输出）
+
+    Returns:
+        解析出的字典，如果无法解析则返回None
+    """
+    # 优先尝试markdown代码块中的JSON
+    for match in _FENCE_RE.finditer(text):
+        try:
+            return json.loads(match.group(1))
+        except (json.JSONDecodeError, ValueError):
+            continue
+
+    # 退而扫描裸露的配平{...}片段，每个候选只解析一次
+    for candidate in _balanced_json_spans(text):
+        try:
+            return json.loads(candidate)
+        except (json.JSONDecodeError, ValueError):
+            continue
+    return None
+
+
+def extract_keywords(text: str, max_keywords: int = 5) -> List[str]:
+    """
+    从文本中提取高频关键词
+
+    Args:
+        text: 原始文本
+        max_keywords: 最多返回的关键词数量
+
+    Returns:
+        关键词列表，按出现频率降序
+    """
+    filtered = (
+        word for word in _WORD_RE.findall(text.lower())
+        if word not in _STOP_WORDS and len(word) > 1
+    )
+    return [word for word, _ in Counter(filtered).most_common(max_keywords)]
+
+
+def calculate_similarity(text1: str, text2: str) -> float:
+    """
+    计算两段文本的Jaccard相似度
+
+    Args:
+        text1: 第一段文本
+        text2: 第二段文本
+
+    Returns:
+        相似度分数（0到1）
+    """
+    words1 = set(text1.lower().split())
+    words2 = set(text2.lower().split())
+
+    if not words1 or not words2:
+        return 0.0
+
+    # |A∪B| = |A| + |B| - |A∩B|，省去构造并集的分配开销
+    intersection = len(words1 & words2)
+    return intersection / (len(words1) + len(words2) - intersection)
+
+
+def vectorize_texts(texts: List[str], n_features: int = 2 ** 18):
+    """
+    将一批文本向量化为稀疏词频矩阵
+
+    逐条调用extract_keywords/calculate_similarity时，分词都在Python层
+    进行；批量场景改用HashingVectorizer，分词和计数都在C层完成。
+
+    Args:
+        texts: 文本列表
+        n_features: 哈希特征空间大小
+
+    Returns:
+        scipy CSR稀疏矩阵，每行对应一条文本
+    """
+    from sklearn.feature_extraction.text import HashingVectorizer
+    vectorizer = HashingVectorizer(n_features=n_features, analyzer='word',
+                                   alternate_sign=False, norm=None)
+    return vectorizer.transform(texts)
+
+
+def similarity_matrix(texts: List[str]):
+    """
+    计算一批文本两两之间的余弦相似度矩阵
+
+    Args:
+        texts: 文本列表
+
+    Returns:
+        N x N的相似度矩阵（numpy数组）
+    """
+    from sklearn.metrics.pairwise import cosine_similarity
+    return cosine_similarity(vectorize_texts(texts))
+
+
+def safe_file_name(name: str) -> str:
+    """
+    将字符串转换为安全的文件名
+
+    Args:
+        name: 原始字符串
+
+    Returns:
+        去除非法字符后的文件名
+    """
+    return _UNSAFE_RE.sub('_', name).strip()
+
+
+def merge_dicts(dict1: Dict[str, Any],
+                dict2: Dict[str, Any],
+                overwrite: bool = True) -> Dict[str, Any]:
+    """
+    深度合并两个字典，嵌套字典递归合并，其余值按overwrite策略处理
+
+    Args:
+        dict1: 基础字典
+        dict2: 要合并进来的字典
+        overwrite: 键冲突时是否用dict2的值覆盖
+
+    Returns:
+        合并后的新字典，入参不被修改
+    """
+    # 没有嵌套字典冲突时，C层的dict联合操作一步完成
+    if overwrite and not any(
+            isinstance(v, dict) and isinstance(dict1.get(k), dict)
+            for k, v in dict2.items()):
+        return dict1 | dict2
+
+    result = dict1.copy()
+    stack = [(result, dict2)]
+    while stack:
+        dst, src = stack.pop()
+        for key, value in src.items():
+            existing = dst.get(key)
+            if isinstance(value, dict) and isinstance(existing, dict):
+                merged = existing.copy()
+                dst[key] = merged
+                stack.append((merged, value))
+            elif overwrite or key not in dst:
+                dst[key] = value
+    return result
+
+
+_DEFAULT_TIMESTAMP_FORMAT = "%Y%m%d%H%M%S"
+
+
+def get_timestamp(format_str: str = _DEFAULT_TIMESTAMP_FORMAT) -> str:
+    """
+    获取当前时间的时间戳字符串，用于结果和对话文件命名
+
+    Args:
+        format_str: 时间格式，默认为紧凑的年月日时分秒
+
+    Returns:
+        格式化的时间戳字符串
+    """
+    if format_str is _DEFAULT_TIMESTAMP_FORMAT:
+        # 默认格式走手工拼接，跳过strftime的格式解析开销
+        t = time.localtime()
+        return (f"{t.tm_year:04d}{t.tm_mon:02d}{t.tm_mday:02d}"
+                f"{t.tm_hour:02d}{t.tm_min:02d}{t.tm_sec:02d}")
+    return datetime.datetime.now().strftime(format_str)
+
+
+def get_uuid() -> str:
+    """
+    生成一个不带连字符的UUID字符串
+
+    Returns:
+        32位十六进制UUID字符串
+    """
+    return uuid.uuid4().hex
+
+
+def get_short_uuid(length: int = 8) -> str:
+    """
+    生成一个短随机ID
+
+    Args:
+        length: ID长度
+
+    Returns:
+        指定长度的十六进制随机字符串
+    """
+    return secrets.token_hex((length + 1) // 2)[:length]
+
+
+# 按正则一次判定格式，再精确调用一次strptime，
+# 避免逐个格式try/except的线性探测
+_TIME_FORMATS = (
+    (re.compile(r'\A\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}\Z'), None),  # ISO走fromisoformat
+    (re.compile(r'\A\d{4}/\d{2}/\d{2} \d{2}:\d{2}:\d{2}\Z'), "%Y/%m/%d %H:%M:%S"),
+    (re.compile(r'\A\d{4}-\d{2}-\d{2}\Z'), None),
+    (re.compile(r'\A\d{4}/\d{2}/\d{2}\Z'), "%Y/%m/%d"),
+    (re.compile(r'\A\d{14}\Z'), "%Y%m%d%H%M%S"),
+)
+
+
+def parse_time_str(time_str: str) -> Optional[datetime.datetime]:
+    """
+    解析常见格式的时间字符串
+
+    Args:
+        time_str: 时间字符串
+
+    Returns:
+        datetime对象，无法识别的格式返回None
+    """
+    for pattern, fmt in _TIME_FORMATS:
+        if pattern.match(time_str):
+            if fmt is None:
+                # ISO格式用C实现的fromisoformat，远快于strptime
+                return datetime.datetime.fromisoformat(time_str)
+            return datetime.datetime.strptime(time_str, fmt)
+    return None
+
 
 def format_timestamp(timestamp: float) -> str:
     """
@@ -21,6 +325,11 @@ def format_timestamp(timestamp: float) -> str:
     return dt.strftime("%Y-%m-%d %H:%M:%S")
 
 
+# 情绪值分档：bisect在预排序阈值上做二分，替代分支链
+_MOOD_THRESHOLDS = (-0.7, -0.3, 0.3, 0.7)
+_MOOD_LABELS = ("非常消极", "消极", "中性", "积极", "非常积极")
+
+
 def format_mood(mood_value: float) -> str:
     """
     将情绪值转换为描述性文本
@@ -31,16 +340,22 @@ def format_mood(mood_value: float) -> str:
     Returns:
         描述性文本
     """
-    if mood_value >= 0.7:
-        return "非常积极"
-    elif mood_value >= 0.3:
-        return "积极"
-    elif mood_value >= -0.3:
-        return "中性"
-    elif mood_value >= -0.7:
-        return "消极"
-    else:
-        return "非常消极"
+    return _MOOD_LABELS[bisect.bisect_right(_MOOD_THRESHOLDS, mood_value)]
+
+
+def format_mood_batch(mood_values) -> List[str]:
+    """
+    批量将情绪值转换为描述性文本
+
+    Args:
+        mood_values: 情绪值序列
+
+    Returns:
+        描述性文本列表
+    """
+    import numpy as np
+    indices = np.searchsorted(_MOOD_THRESHOLDS, mood_values, side='right')
+    return [_MOOD_LABELS[i] for i in indices]
 
 
 def format_mood_trend(trend: str) -> str:
@@ -74,8 +389,8 @@ def load_results(results_file: str) -> Dict[str, Any]:
     Returns:
         评估结果字典
     """
-    with open(results_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(results_file, 'rb') as f:
+        return _loads(f.read())
 
 
 def list_result_files(results_dir: str = "results") -> List[str]:
@@ -88,17 +403,20 @@ def list_result_files(results_dir: str = "results") -> List[str]:
     Returns:
         结果文件路径列表
     """
-    if not os.path.exists(results_dir):
+    # scandir一次拿到目录项和stat缓存，省掉每个文件单独的getmtime系统调用
+    try:
+        with os.scandir(results_dir) as it:
+            entries = [
+                (entry.path, entry.stat().st_mtime)
+                for entry in it
+                if entry.name.startswith("evaluation_") and entry.name.endswith(".json")
+            ]
+    except FileNotFoundError:
         return []
-        
-    files = [
-        os.path.join(results_dir, f)
-        for f in os.listdir(results_dir)
-        if f.startswith("evaluation_") and f.endswith(".json")
-    ]
-    
+
     # 按修改时间排序，最新的在前
-    return sorted(files, key=lambda x: os.path.getmtime(x), reverse=True)
+    entries.sort(key=lambda pair: pair[1], reverse=True)
+    return [path for path, _ in entries]
 
 
 def print_conversation(conversation_history: List[Dict[str, str]]) -> None:
@@ -108,10 +426,12 @@ def print_conversation(conversation_history: List[Dict[str, str]]) -> None:
     Args:
         conversation_history: 对话历史列表
     """
+    # 先拼进缓冲区再一次性写出，长对话不必每条消息发两次write
+    lines = []
     for i, msg in enumerate(conversation_history):
         role = "虚拟人物" if msg["role"] == "assistant" else "待测模型"
-        print(f"\n[{i//2 + 1}] {role}:")
-        print(msg["content"])
+        lines.append(f"\n[{i//2 + 1}] {role}:\n{msg['content']}")
+    sys.stdout.write("".join(lines) + "\n")
 
 
 def print_cognitive_model(cognitive_model: Dict[str, Any], title: str = "认知模型") -> None:
@@ -0,0 +1,585 @@
+"""
+对话可视化工具，将对话历史和情绪数据渲染为PNG图表
+"""
+import os
+import logging
+import textwrap
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+from utils import get_timestamp, _loads, _dumps
+
+# matplotlib导入要几百毫秒，numpy也不便宜；推迟到真正绘图时再加载，
+# 只用load_*/find_*的调用方不必付这笔启动成本
+np = None
+plt = None
+Figure = None
+FigureCanvasAgg = None
+LineCollection = None
+Line2D = None
+
+
+def _ensure_plotting() -> None:
+    """
+    按需加载numpy和matplotlib并写回模块全局
+
+    所有入口都只输出PNG文件，显式切到纯光栅的Agg后端以免初始化
+    GUI事件循环；Agg必须在导入pyplot之前选定。重复调用直接返回。
+    """
+    global np, plt, Figure, FigureCanvasAgg, LineCollection, Line2D
+    if plt is not None:
+        return
+    import numpy
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as pyplot
+    from matplotlib.figure import Figure as figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg as canvas_agg
+    from matplotlib.collections import LineCollection as line_collection
+    from matplotlib.lines import Line2D as line2d
+    np = numpy
+    plt = pyplot
+    Figure = figure
+    FigureCanvasAgg = canvas_agg
+    LineCollection = line_collection
+    Line2D = line2d
+
+
+def _emo_stats(scores: "np.ndarray"):
+    """
+    单遍扫描情绪得分数组，返回(均值, 方差, 波动度)
+
+    一个循环同时累计和、平方和与相邻差的绝对值之和，
+    不产生任何中间数组；装了numba时编译为原生代码执行。
+
+    Args:
+        scores: float64情绪得分数组，长度至少为1
+
+    Returns:
+        (均值, 方差, 波动度)的元组
+    """
+    n = scores.shape[0]
+    total = 0.0
+    total_sq = 0.0
+    total_diff = 0.0
+    for i in range(n):
+        value = scores[i]
+        total += value
+        total_sq += value * value
+        if i > 0:
+            total_diff += abs(value - scores[i - 1])
+    mean = total / n
+    variance = total_sq / n - mean * mean if n > 1 else 0.0
+    volatility = total_diff / (n - 1) if n > 1 else 0.0
+    return mean, variance, volatility
+
+
+try:
+    # 内核只用标量和ndarray下标，nopython模式可以直接编译
+    from numba import njit
+    _emo_stats = njit(cache=True)(_emo_stats)
+except ImportError:
+    pass
+
+
+# PNG编码用zlib等级1：看板图像即弃即用，默认等级6的压缩CPU
+# 开销远大于省下的体积
+_FAST_PNG = {"compress_level": 1}
+
+
+def _coerce(value: Any) -> float:
+    """
+    把情绪值规整成float
+
+    情绪项可能是数字，也可能是带value/score字段的字典，
+    其余情况一律按0.0处理。
+
+    Args:
+        value: 原始情绪值
+
+    Returns:
+        对应的float值
+    """
+    if isinstance(value, dict):
+        value = value.get('value', value.get('score', 0.0))
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _series_colors(count: int) -> List[str]:
+    """
+    按默认色环为count条曲线分配颜色
+
+    Args:
+        count: 曲线数量
+
+    Returns:
+        颜色列表，超过色环长度时循环复用
+    """
+    cycle = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    return [cycle[i % len(cycle)] for i in range(count)]
+
+
+class DialogueVisualizer:
+    """
+    对话可视化器，把单次对话的情绪曲线、消息分布等画成图表
+    """
+
+    def __init__(self,
+                 output_dir: str = "results/visualizations",
+                 dpi: int = 120,
+                 tight: bool = False):
+        """
+        初始化可视化器
+
+        Args:
+            output_dir: 图表输出目录
+            dpi: 输出图片分辨率，默认120足够看板使用
+            tight: 是否用tight裁边；会多一次测量渲染，默认关闭
+        """
+        self.logger = logging.getLogger("lebench.visualizer")
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.dpi = dpi
+        self.tight = tight
+        # 复用同一对Figure/Axes，各方法绘制前clear，
+        # 连续出图时不必反复分配Figure+Canvas和后端状态。
+        # 直接构造Figure而不走plt.subplots，不在pyplot的全局
+        # 图管理器里注册，实例回收时图随之释放、不会累积
+        _ensure_plotting()
+        self._fig = Figure(figsize=(10, 6))
+        FigureCanvasAgg(self._fig)
+        self._ax = self._fig.add_subplot()
+
+    def load_dialogue(self, file_path: str) -> Dict[str, Any]:
+        """
+        加载对话记录文件
+
+        Args:
+            file_path: 对话JSON文件路径
+
+        Returns:
+            对话记录字典
+        """
+        with open(file_path, 'rb') as f:
+            return _loads(f.read())
+
+    def visualize_emotion_flow(self,
+                               dialogue_history: List[Dict[str, Any]],
+                               emotion_keys: Optional[List[str]] = None,
+                               output_file: Optional[str] = None,
+                               timestamp: Optional[str] = None) -> str:
+        """
+        绘制对话过程中各情绪维度的变化曲线
+
+        Args:
+            dialogue_history: 对话历史，每条消息可带emotions字典
+            emotion_keys: 要绘制的情绪维度，缺省时绘制出现过的全部维度
+            output_file: 输出文件路径，缺省时按时间戳生成
+            timestamp: 文件名用的时间戳，缺省时取当前时间
+
+        Returns:
+            输出文件路径
+        """
+        if emotion_keys is None:
+            keys = []
+            for message in dialogue_history:
+                emotions = message.get("emotions")
+                if isinstance(emotions, dict):
+                    for key in emotions:
+                        if key not in keys:
+                            keys.append(key)
+            emotion_keys = keys
+
+        # 先在NumPy矩阵里完成归约，再把连续的float64列交给matplotlib，
+        # 缺失点记为NaN，之后统一前向填充
+        num_msgs = len(dialogue_history)
+        num_keys = len(emotion_keys)
+        key_index = {key: j for j, key in enumerate(emotion_keys)}
+        # 内层只遍历消息实际带的emotions项，用set做成员判断，
+        # 不再对每条消息把全部维度过一遍
+        keys_set = frozenset(emotion_keys)
+        arr = np.full((num_msgs, num_keys), np.nan)
+        coerce = _coerce
+        for i, message in enumerate(dialogue_history):
+            emotions = message.get("emotions")
+            if not isinstance(emotions, dict):
+                continue
+            for key, emotion_value in emotions.items():
+                if key in keys_set:
+                    arr[i, key_index[key]] = coerce(emotion_value)
+
+        # 完全没有数据的维度不画；其余维度前向填充，起始缺失记0。
+        # 填充是向量化的：每个位置取最近一次有值的行号，再花式索引取值
+        has_data = ~np.all(np.isnan(arr), axis=0) if num_msgs else np.zeros(
+            num_keys, dtype=bool)
+        if num_msgs and num_keys:
+            valid = ~np.isnan(arr)
+            arr[0, ~valid[0]] = 0.0
+            idx = np.where(valid, np.arange(num_msgs)[:, None], 0)
+            np.maximum.accumulate(idx, axis=0, out=idx)
+            arr = arr[idx, np.arange(num_keys)[None, :]]
+
+        # 所有曲线合成一个LineCollection、所有标记点合成一次scatter，
+        # 维度很多时也只产生常数个artist，而不是每条曲线一个Line2D
+        fig, ax = self._fig, self._ax
+        fig.set_size_inches(10, 6)
+        ax.clear()
+        x = np.arange(1, num_msgs + 1)
+        active = [key for key in emotion_keys if has_data[key_index[key]]]
+        colors = _series_colors(len(active))
+        segments = [np.column_stack([x, arr[:, key_index[key]]])
+                    for key in active]
+        if segments:
+            ax.add_collection(
+                LineCollection(segments, colors=colors, linewidths=1.5))
+            ax.scatter(np.tile(x, len(active)),
+                       np.concatenate([seg[:, 1] for seg in segments]),
+                       c=[c for c in colors for _ in range(num_msgs)], s=18)
+            ax.autoscale_view()
+        ax.set_xlabel("对话轮次")
+        ax.set_ylabel("情绪值")
+        ax.set_title("对话情绪变化")
+        ax.legend(handles=[
+            Line2D([], [], color=c, marker='o', label=key)
+            for key, c in zip(active, colors)])
+        ax.grid(True, alpha=0.3)
+
+        if output_file is None:
+            if timestamp is None:
+                timestamp = get_timestamp()
+            output_file = str(self.output_dir / f"emotion_flow_{timestamp}.png")
+        fig.savefig(output_file, dpi=self.dpi,
+                    bbox_inches='tight' if self.tight else None,
+                    pil_kwargs=_FAST_PNG)
+        return output_file
+
+    def visualize_message_distribution(self,
+                                       dialogue_history: List[Dict[str, Any]],
+                                       output_file: Optional[str] = None,
+                                       timestamp: Optional[str] = None) -> str:
+        """
+        绘制角色与伴侣的消息数量分布饼图
+
+        Args:
+            dialogue_history: 对话历史，每条消息带sender字段
+            output_file: 输出文件路径，缺省时按时间戳生成
+            timestamp: 文件名用的时间戳，缺省时取当前时间
+
+        Returns:
+            输出文件路径
+        """
+        # 一趟循环同时计两个数，不为两类发送方各扫一遍历史；
+        # dict.get绑定成局部名，循环里少一次方法查找
+        character_count = 0
+        partner_count = 0
+        msg_get = dict.get
+        for message in dialogue_history:
+            sender = msg_get(message, "sender")
+            if sender == "character":
+                character_count += 1
+            elif sender == "partner":
+                partner_count += 1
+
+        fig, ax = self._fig, self._ax
+        fig.set_size_inches(8, 8)
+        ax.clear()
+        if character_count or partner_count:
+            ax.pie([character_count, partner_count],
+                   labels=["角色", "伴侣"],
+                   autopct='%1.1f%%',
+                   startangle=90)
+        else:
+            # 两类计数都为0时饼图无法绘制（如历史为空），出占位图
+            ax.axis('off')
+            ax.text(0.5, 0.5, "无消息", fontsize=14, ha='center', va='center')
+        ax.set_title("消息数量分布")
+
+        if output_file is None:
+            if timestamp is None:
+                timestamp = get_timestamp()
+            output_file = str(self.output_dir / f"message_dist_{timestamp}.png")
+        fig.savefig(output_file, dpi=self.dpi,
+                    bbox_inches='tight' if self.tight else None,
+                    pil_kwargs=_FAST_PNG)
+        return output_file
+
+    def visualize_message_length(self,
+                                 dialogue_history: List[Dict[str, Any]],
+                                 output_file: Optional[str] = None,
+                                 timestamp: Optional[str] = None) -> str:
+        """
+        绘制双方每条消息长度的柱状图
+
+        Args:
+            dialogue_history: 对话历史
+            output_file: 输出文件路径，缺省时按时间戳生成
+            timestamp: 文件名用的时间戳，缺省时取当前时间
+
+        Returns:
+            输出文件路径
+        """
+        # 同样单趟扫描，按发送方把长度分进两个列表；
+        # dict.get和list.append都预先绑定，去掉循环内的属性查找
+        character_lengths: List[int] = []
+        partner_lengths: List[int] = []
+        msg_get = dict.get
+        add_character = character_lengths.append
+        add_partner = partner_lengths.append
+        for message in dialogue_history:
+            sender = msg_get(message, "sender")
+            if sender == "character":
+                add_character(len(msg_get(message, "content", "")))
+            elif sender == "partner":
+                add_partner(len(msg_get(message, "content", "")))
+
+        fig, ax = self._fig, self._ax
+        fig.set_size_inches(10, 6)
+        ax.clear()
+        # x轴只算一次np.arange，两组长度补零对齐后共用；
+        # 位移在ndarray上做，不再按条构造Python列表
+        count = max(len(character_lengths), len(partner_lengths))
+        x = np.arange(count)
+        heights = np.zeros((2, count))
+        heights[0, :len(character_lengths)] = character_lengths
+        heights[1, :len(partner_lengths)] = partner_lengths
+        ax.bar(x - 0.2, heights[0], width=0.4, label="角色")
+        ax.bar(x + 0.2, heights[1], width=0.4, label="伴侣")
+        ax.set_xlabel("消息序号")
+        ax.set_ylabel("字符数")
+        ax.set_title("消息长度对比")
+        ax.legend()
+
+        if output_file is None:
+            if timestamp is None:
+                timestamp = get_timestamp()
+            output_file = str(self.output_dir / f"message_length_{timestamp}.png")
+        fig.savefig(output_file, dpi=self.dpi,
+                    bbox_inches='tight' if self.tight else None,
+                    pil_kwargs=_FAST_PNG)
+        return output_file
+
+    def visualize_dialogue_summary(self,
+                                   dialogue_data: Dict[str, Any],
+                                   output_file: Optional[str] = None,
+                                   timestamp: Optional[str] = None) -> str:
+        """
+        将对话摘要渲染为一张文本图片
+
+        Args:
+            dialogue_data: 对话记录，可带memory_summary字段
+            output_file: 输出文件路径，缺省时按时间戳生成
+            timestamp: 文件名用的时间戳，缺省时取当前时间
+
+        Returns:
+            输出文件路径
+        """
+        memory_summary = dialogue_data.get("memory_summary", "无摘要")
+
+        # textwrap一次性断行，避免手工循环里的重复字符串拼接
+        lines = textwrap.wrap(memory_summary, width=80)
+        wrapped = "\n".join(lines) if lines else memory_summary
+
+        fig, ax = self._fig, self._ax
+        fig.set_size_inches(10, 6)
+        ax.clear()
+        ax.axis('off')
+        ax.text(0.05, 0.95, f"对话摘要\n\n{wrapped}",
+                fontsize=11, va='top', wrap=True)
+
+        if output_file is None:
+            if timestamp is None:
+                timestamp = get_timestamp()
+            output_file = str(self.output_dir / f"summary_{timestamp}.png")
+        fig.savefig(output_file, dpi=self.dpi,
+                    bbox_inches='tight' if self.tight else None,
+                    pil_kwargs=_FAST_PNG)
+        return output_file
+
+    def generate_dialogue_report(self,
+                                 dialogue_data: Dict[str, Any],
+                                 report_dir: Optional[str] = None) -> Dict[str, str]:
+        """
+        为一次对话生成整套图表和报告索引
+
+        Args:
+            dialogue_data: 对话记录，包含dialogue_history等字段
+            report_dir: 报告输出目录，缺省时在output_dir下按时间戳建目录
+
+        Returns:
+            图表名到文件路径的映射
+        """
+        # 整套报告共用一个时间戳，只取一次当前时间
+        timestamp = get_timestamp()
+        if report_dir is None:
+            report_dir = str(self.output_dir / f"report_{timestamp}")
+        report_path = Path(report_dir)
+        report_path.mkdir(parents=True, exist_ok=True)
+
+        history = dialogue_data.get("dialogue_history", [])
+        report = {
+            "emotion_flow": self.visualize_emotion_flow(
+                history, output_file=str(report_path / "emotion_flow.png")),
+            "message_distribution": self.visualize_message_distribution(
+                history, output_file=str(report_path / "message_dist.png")),
+            "message_length": self.visualize_message_length(
+                history, output_file=str(report_path / "message_length.png")),
+            "summary": self.visualize_dialogue_summary(
+                dialogue_data, output_file=str(report_path / "summary.png")),
+        }
+
+        report_info = dict(report)
+        report_info["timestamp"] = timestamp
+        (report_path / "report_info.json").write_bytes(_dumps(report_info))
+        return report
+
+
+def load_log_file(file_path: str) -> Dict[str, Any]:
+    """
+    加载单个情绪日志文件
+
+    Args:
+        file_path: 日志JSON文件路径
+
+    Returns:
+        日志字典
+    """
+    with open(file_path, 'rb') as f:
+        return _loads(f.read())
+
+
+def visualize_emotion_trajectories(log_files: List[str],
+                                   output_file: str = "emotion_trajectories.png",
+                                   dpi: int = 120,
+                                   tight: bool = False) -> str:
+    """
+    绘制多次对话的情绪轨迹对比图及统计柱状图
+
+    上半部分为每次对话的情绪得分曲线，下半部分为起始/最终/平均
+    情绪等统计量的柱状图。
+
+    Args:
+        log_files: 情绪日志文件路径列表
+        output_file: 输出文件路径
+        dpi: 输出图片分辨率
+        tight: 是否用tight裁边，会多一次测量渲染
+
+    Returns:
+        输出文件路径
+    """
+    _ensure_plotting()
+
+    def _load(file_path: str) -> Optional[Dict[str, Any]]:
+        try:
+            return load_log_file(file_path)
+        except (OSError, ValueError) as e:
+            logging.getLogger("lebench.visualizer").warning(
+                "加载日志失败 %s: %s", file_path, e)
+            return None
+
+    # 日志文件并行加载：orjson在C层解析时释放GIL，
+    # 线程池读多文件接近线性加速；失败的文件记日志后跳过
+    if len(log_files) > 1:
+        with ThreadPoolExecutor() as executor:
+            loaded = executor.map(_load, log_files)
+            logs = [data for data in loaded if data is not None]
+    else:
+        logs = [data for data in map(_load, log_files) if data is not None]
+
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+
+    # 轨迹曲线全部攒进一个LineCollection一次绘制，
+    # 标记点也合成一次scatter，图例用代理Line2D表示
+    stats = []
+    segments = []
+    for data in logs:
+        # 一次性把得分转成float64数组，绘图、标注和统计共用，
+        # 不再先建Python列表再重复转换
+        y = np.asarray(data.get("emotion_scores", ()), dtype=np.float64)
+        if y.size == 0:
+            continue
+        label = data.get("model_name", data.get("id", "未命名"))
+        turns = np.arange(1, y.size + 1)
+        segments.append(np.column_stack([turns, y]))
+        # 只标注每条轨迹的终点：每个text artist都要单独排版，
+        # 逐轮标注在多日志图上是最大的绘制开销
+        ax1.annotate(f"{y[-1]:.2f}", xy=(y.size, y[-1]),
+                     textcoords="offset points", xytext=(4, 4), fontsize=7)
+
+        avg, variance, volatility = _emo_stats(y)
+        stats.append({
+            "label": label,
+            "start": float(y[0]),
+            "final": float(y[-1]),
+            "change": float(y[-1] - y[0]),
+            "avg": float(avg),
+            "variance": float(variance),
+            "volatility": float(volatility),
+        })
+
+    colors = _series_colors(len(segments))
+    if segments:
+        ax1.add_collection(
+            LineCollection(segments, colors=colors, linewidths=1.5))
+        ax1.scatter(np.concatenate([seg[:, 0] for seg in segments]),
+                    np.concatenate([seg[:, 1] for seg in segments]),
+                    c=[c for seg, c in zip(segments, colors)
+                       for _ in range(seg.shape[0])], s=18)
+        ax1.autoscale_view()
+
+    ax1.set_xlabel("对话轮次")
+    ax1.set_ylabel("情绪得分")
+    ax1.set_title("情绪轨迹对比")
+    ax1.grid(True, alpha=0.3)
+    if stats:
+        ax1.legend(handles=[
+            Line2D([], [], color=c, marker='o', label=s["label"])
+            for s, c in zip(stats, colors)])
+
+    if stats:
+        labels = [s["label"] for s in stats]
+        fields = ("start", "final", "change", "avg", "variance", "volatility")
+        # x轴和每组柱子的位移都预先算成ndarray，循环里只剩bar调用本身
+        x = np.arange(len(stats))
+        width = 0.15
+        offsets = (np.arange(len(fields)) - 2.5) * width
+        heights = np.array([[s[field] for s in stats] for field in fields])
+        for offset, field, row in zip(offsets, fields, heights):
+            ax2.bar(x + offset, row, width, label=field)
+        ax2.set_xticks(x)
+        ax2.set_xticklabels(labels, rotation=15, fontsize=8)
+        ax2.set_title("情绪统计对比")
+        ax2.legend(fontsize=8)
+
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=dpi,
+                bbox_inches='tight' if tight else None,
+                pil_kwargs=_FAST_PNG)
+    plt.close(fig)
+    return output_file
+
+
+def find_latest_dialogue_dir(result_dir: str = "results") -> Optional[Path]:
+    """
+    找到结果目录下最近修改的对话子目录
+
+    Args:
+        result_dir: 结果根目录
+
+    Returns:
+        最新的对话目录路径，目录不存在或为空时返回None
+    """
+    # scandir的DirEntry缓存了stat结果，不用为每个目录再发一次stat
+    try:
+        with os.scandir(result_dir) as it:
+            latest = max(
+                (entry for entry in it if entry.is_dir()),
+                key=lambda entry: entry.stat().st_mtime,
+                default=None,
+            )
+    except FileNotFoundError:
+        return None
+    return Path(latest.path) if latest is not None else None